@@ -1,14 +1,22 @@
+import atexit
+import threading
+
 import cv2
 import numpy as np
 import mediapipe as mp
 
 
 # region agent log
+_LOG_FH = None  # persistent buffered handle, opened lazily
+_LOG_LOCK = threading.Lock()
+
+
 def _agent_debug_log(run_id: str, hypothesis_id: str, location: str, message: str, data: dict) -> None:
     """Lightweight NDJSON logger for debug-mode instrumentation."""
     import json
     import os
     import time
+    global _LOG_FH
     log_entry = {
         "id": f"log_{int(time.time() * 1000)}",
         "timestamp": int(time.time() * 1000),
@@ -21,9 +29,13 @@ def _agent_debug_log(run_id: str, hypothesis_id: str, location: str, message: st
     log_dir = r"c:\Users\Thinkpad\Documents\screen_control\.cursor"
     log_path = os.path.join(log_dir, "debug.log")
     try:
-        os.makedirs(log_dir, exist_ok=True)
-        with open(log_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        with _LOG_LOCK:
+            if _LOG_FH is None:
+                os.makedirs(log_dir, exist_ok=True)
+                _LOG_FH = open(log_path, "a", encoding="utf-8", buffering=65536)
+                # close() flushes the buffer on interpreter exit
+                atexit.register(_LOG_FH.close)
+            _LOG_FH.write(json.dumps(log_entry) + "\n")
     except Exception:
         # Logging must never break the main program
         pass
@@ -43,6 +55,11 @@ _agent_debug_log(
 # endregion
 
 
+def _ema2(lx, ly, nx, ny, a):
+    """Exponential moving average of a 2D point, as scalars."""
+    return (1.0 - a) * lx + a * nx, (1.0 - a) * ly + a * ny
+
+
 class GazeTracker:
     """
     Phase 1: simple gaze visualization.
@@ -67,6 +84,15 @@ class GazeTracker:
         self.cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
         if not self.cap.isOpened():
             raise RuntimeError("Could not open webcam. Check camera permissions or index.")
+        # Keep only the freshest frame so the gaze dot doesn't lag behind the eyes
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.cap.set(cv2.CAP_PROP_FPS, 30)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+
+        # FaceMesh cost scales with pixel count; landmarks come back normalized,
+        # so a downscaled inference frame does not change the gaze math.
+        self.infer_size = (320, 240)  # (width, height)
 
         # Configure MediaPipe FaceMesh
         self.mp_face_mesh = mp.solutions.face_mesh
@@ -82,7 +108,8 @@ class GazeTracker:
         self.mp_drawing_styles = mp.solutions.drawing_styles
 
         # Store last valid gaze for smoothing
-        self.last_gaze = None
+        self._lx = None
+        self._ly = None
         self.smoothing_factor = 0.15  # smaller = smoother, larger = more responsive
 
         # Calibration state
@@ -98,6 +125,7 @@ class GazeTracker:
         self.calibration_samples_per_point = 30
         self._reset_calibration_state()
         self.calibration_matrix = None  # 3x2 affine matrix
+        self._cal = None  # calibration_matrix flattened to scalars (m00, m01, m10, m11, m20, m21)
 
         # Landmark indices for iris and eye region (MediaPipe FaceMesh)
         # Using right eye (from user's perspective) as an example.
@@ -105,19 +133,25 @@ class GazeTracker:
         self.right_iris_indices = [474, 475, 476, 477]
         self.right_eye_indices = [33, 160, 158, 133, 153, 144, 159, 145]
 
+        # Iris + eye indices gathered in one pass per frame
+        # (plain ints: protobuf repeated fields index fastest with Python ints)
+        self._all_eye_idx = tuple(self.right_iris_indices + self.right_eye_indices)
+        self._iris_slice = slice(0, len(self.right_iris_indices))
+        self._eye_slice = slice(len(self.right_iris_indices), len(self._all_eye_idx))
+
     def _smooth_gaze(self, new_gaze):
-        if self.last_gaze is None:
-            self.last_gaze = new_gaze
+        nx, ny = new_gaze
+        if self._lx is None:
+            self._lx, self._ly = nx, ny
         else:
-            self.last_gaze = (
-                (1 - self.smoothing_factor) * np.array(self.last_gaze)
-                + self.smoothing_factor * np.array(new_gaze)
-            )
-        return tuple(self.last_gaze)
+            self._lx, self._ly = _ema2(self._lx, self._ly, nx, ny, self.smoothing_factor)
+        return self._lx, self._ly
 
     def _reset_calibration_state(self):
         self.current_calib_index = 0
-        self.current_raw_samples = []
+        # Preallocated sample buffer for the current calibration point
+        self._samp_buf = np.empty((self.calibration_samples_per_point, 2), dtype=np.float64)
+        self._samp_n = 0
         self.calib_inputs = []
         self.calib_targets = []
 
@@ -127,11 +161,12 @@ class GazeTracker:
 
     def _apply_calibration(self, raw_gaze):
         """Apply learned affine mapping if available; otherwise return raw gaze."""
-        if self.calibration_matrix is None or raw_gaze is None:
+        if self._cal is None or raw_gaze is None:
             return raw_gaze
-        v = np.array([raw_gaze[0], raw_gaze[1], 1.0])
-        out = v @ self.calibration_matrix  # shape (2,)
-        return float(out[0]), float(out[1])
+        # [gx, gy, 1] @ M written out as scalars: no per-frame ndarray
+        gx, gy = raw_gaze
+        m00, m01, m10, m11, m20, m21 = self._cal
+        return gx * m00 + gy * m10 + m20, gx * m01 + gy * m11 + m21
 
     def _maybe_collect_calibration_sample(self, raw_gaze):
         if not self.calibration_active or raw_gaze is None:
@@ -139,64 +174,97 @@ class GazeTracker:
         if self.current_calib_index >= len(self.calibration_points):
             return
 
-        self.current_raw_samples.append(raw_gaze)
-        if len(self.current_raw_samples) >= self.calibration_samples_per_point:
+        self._samp_buf[self._samp_n] = raw_gaze
+        self._samp_n += 1
+        if self._samp_n >= self.calibration_samples_per_point:
             # Average current point samples
-            avg = tuple(np.mean(self.current_raw_samples, axis=0))
+            avg = tuple(self._samp_buf[:self._samp_n].mean(axis=0))
             self.calib_inputs.append(avg)
             self.calib_targets.append(self.calibration_points[self.current_calib_index])
             self.current_calib_index += 1
-            self.current_raw_samples = []
+            self._samp_n = 0
 
             if self.current_calib_index >= len(self.calibration_points):
                 # Compute affine mapping: [gx, gy, 1] -> [sx, sy]
-                A = np.hstack(
-                    [np.array(self.calib_inputs), np.ones((len(self.calib_inputs), 1))]
+                # Least squares via the normal equations (P^T P) M = P^T Q.
+                P = np.array(
+                    [[gx, gy, 1.0] for gx, gy in self.calib_inputs], dtype=np.float64
                 )  # (N,3)
-                B = np.array(self.calib_targets)  # (N,2)
+                Q = np.array(self.calib_targets, dtype=np.float64)  # (N,2)
                 try:
-                    M, _, _, _ = np.linalg.lstsq(A, B, rcond=None)  # (3,2)
+                    M = np.linalg.solve(P.T @ P, P.T @ Q)  # (3,2)
                     self.calibration_matrix = M  # store as (3,2)
+                    self._cal = tuple(float(v) for v in M.flat)
                     self.calibration_active = False
                 except Exception as e:
                     print(f"Calibration failed: {e}")
                     self.calibration_active = False
 
-    def _estimate_gaze_from_landmarks(self, landmarks, image_shape):
+    def _landmarks_to_array(self, landmarks):
+        """Extract normalized (x, y) of the iris + eye landmarks as one (N, 2) array."""
+        # One protobuf fetch per landmark; everything after is plain array slicing
+        return np.array(
+            [(lm.x, lm.y) for lm in map(landmarks.__getitem__, self._all_eye_idx)],
+            dtype=np.float32,
+        )
+
+    def _estimate_gaze_from_landmarks(self, lm_xy, image_shape):
+        """`lm_xy` is the (N, 2) array returned by `_landmarks_to_array`."""
         h, w, _ = image_shape
 
-        # Get iris center (right eye)
-        iris_pts = [
-            np.array(
-                [
-                    landmarks[i].x * w,
-                    landmarks[i].y * h,
-                ]
-            )
-            for i in self.right_iris_indices
-        ]
-        iris_center = np.mean(iris_pts, axis=0)
-
-        # Get eye region points for visualization (right eye)
-        eye_pts = [
-            np.array(
-                [
-                    landmarks[i].x * w,
-                    landmarks[i].y * h,
-                ]
-            )
-            for i in self.right_eye_indices
-        ]
-        eye_pts = np.array(eye_pts)
+        # Iris + eye landmarks in pixel space
+        pts = lm_xy * np.array([w, h], dtype=np.float32)
+
+        # Iris center (right eye)
+        iris_center = pts[self._iris_slice].mean(axis=0)
+
+        # Eye region points for visualization (right eye)
+        eye_pts = pts[self._eye_slice]
 
         # Normalize iris position within the full frame to [0, 1] range.
         # This tends to correlate better with where you look on the screen
         # than normalizing inside the small eye box.
-        gaze_x = float(np.clip(iris_center[0] / w, 0.0, 1.0))
-        gaze_y = float(np.clip(iris_center[1] / h, 0.0, 1.0))
+        # Plain scalar clamp; np.clip dispatch is costly for a single value.
+        gaze_x = float(iris_center[0]) / w
+        gaze_y = float(iris_center[1]) / h
+        gaze_x = 0.0 if gaze_x < 0.0 else (1.0 if gaze_x > 1.0 else gaze_x)
+        gaze_y = 0.0 if gaze_y < 0.0 else (1.0 if gaze_y > 1.0 else gaze_y)
 
         return gaze_x, gaze_y, iris_center, eye_pts
 
+    def _blend_circles(self, vis, circles, alpha=0.6):
+        """Additively blend circles into `vis`, touching only their bounding boxes.
+
+        `circles` is a list of (center, radius, color, thickness). Circles whose
+        boxes overlap share one patch (later circles overwrite earlier ones, as
+        on a full-frame overlay) so overlapping pixels are not added twice.
+        """
+        h, w, _ = vis.shape
+
+        # Group circles into clipped boxes, merging boxes that overlap
+        groups = []  # [x0, y0, x1, y1, [circles]]
+        for circle in circles:
+            (cx, cy), radius, _, thickness = circle
+            pad = radius + max(thickness, 0) + 1
+            box = [max(cx - pad, 0), max(cy - pad, 0), min(cx + pad + 1, w), min(cy + pad + 1, h), [circle]]
+            for group in groups:
+                if box[0] < group[2] and group[0] < box[2] and box[1] < group[3] and group[1] < box[3]:
+                    group[0], group[1] = min(group[0], box[0]), min(group[1], box[1])
+                    group[2], group[3] = max(group[2], box[2]), max(group[3], box[3])
+                    group[4].append(circle)
+                    break
+            else:
+                groups.append(box)
+
+        for x0, y0, x1, y1, members in groups:
+            if x0 >= x1 or y0 >= y1:
+                continue
+            roi = vis[y0:y1, x0:x1]
+            patch = np.zeros_like(roi)
+            for (cx, cy), radius, color, thickness in members:
+                cv2.circle(patch, (cx - x0, cy - y0), radius, color, thickness)
+            cv2.addWeighted(roi, 1.0, patch, alpha, 0, dst=roi)
+
     def run(self):
         window_name = "Gaze Phase 1 - Press 'q' to quit"
         cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
@@ -208,7 +276,8 @@ class GazeTracker:
                 break
 
             frame = cv2.flip(frame, 1)  # mirror for natural interaction
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            small = cv2.resize(frame, self.infer_size, interpolation=cv2.INTER_AREA)
+            rgb = np.ascontiguousarray(small[:, :, ::-1])  # BGR -> RGB
 
             results = self.face_mesh.process(rgb)
 
@@ -221,8 +290,9 @@ class GazeTracker:
                 face_landmarks = results.multi_face_landmarks[0].landmark
 
                 try:
+                    lm_xy = self._landmarks_to_array(face_landmarks)
                     gx, gy, iris_center, eye_pts = self._estimate_gaze_from_landmarks(
-                        face_landmarks, frame.shape
+                        lm_xy, frame.shape
                     )
                     raw_gaze = (gx, gy)
                     # Collect calibration samples if needed
@@ -250,25 +320,25 @@ class GazeTracker:
                     -1,
                 )
 
-            # Draw gaze dot and (optionally) calibration target
+            # Draw gaze dot and (optionally) calibration target.
+            # Blended in place over small ROIs instead of a full-frame overlay.
             h, w, _ = vis.shape
-            overlay = np.zeros_like(vis)
+            circles = []
 
             if gaze_point is not None:
                 gx, gy = gaze_point
                 dot_x = int(np.clip(gx, 0.0, 1.0) * w)
                 dot_y = int(np.clip(gy, 0.0, 1.0) * h)
-                cv2.circle(overlay, (dot_x, dot_y), 10, (255, 0, 0), -1)
+                circles.append(((dot_x, dot_y), 10, (255, 0, 0), -1))
 
-            # If calibrating, draw current calibration target on overlay
+            # If calibrating, draw current calibration target
             if self.calibration_active and self.current_calib_index < len(self.calibration_points):
                 tx, ty = self.calibration_points[self.current_calib_index]
                 cx = int(tx * w)
                 cy = int(ty * h)
-                cv2.circle(overlay, (cx, cy), 12, (0, 255, 255), 2)
+                circles.append(((cx, cy), 12, (0, 255, 255), 2))
 
-            alpha = 0.6
-            vis = cv2.addWeighted(vis, 1.0, overlay, alpha, 0)
+            self._blend_circles(vis, circles)
 
             # Display help text
             status_text = (
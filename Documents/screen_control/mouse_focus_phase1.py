@@ -1,6 +1,13 @@
+import ctypes
+from ctypes import wintypes
+
 import cv2
 import numpy as np
-import pyautogui
+
+# Direct Win32 calls for the cursor position and screen size
+_user32 = ctypes.windll.user32
+_GetCursorPos = _user32.GetCursorPos
+_pt = wintypes.POINT()
 
 
 def run_mouse_focus():
@@ -12,7 +19,8 @@ def run_mouse_focus():
     """
 
     # Get screen size so we can normalize mouse coordinates
-    screen_w, screen_h = pyautogui.size()
+    screen_w = _user32.GetSystemMetrics(0)
+    screen_h = _user32.GetSystemMetrics(1)
 
     # Choose a window size (you can resize it manually as well)
     win_w, win_h = 800, 600
@@ -26,7 +34,8 @@ def run_mouse_focus():
         frame = np.zeros((win_h, win_w, 3), dtype=np.uint8)
 
         # Current mouse position in screen coordinates
-        mx, my = pyautogui.position()
+        _GetCursorPos(ctypes.byref(_pt))
+        mx, my = _pt.x, _pt.y
 
         # Normalize and map into window coordinates
         gx = np.clip(mx / screen_w, 0.0, 1.0)
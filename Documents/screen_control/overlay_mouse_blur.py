@@ -1,5 +1,10 @@
+import collections
+import ctypes
+import os
 import time
 import threading
+import zlib
+from ctypes import wintypes
 
 import cv2
 import keyboard
@@ -9,29 +14,157 @@ import win32con
 import win32gui
 import win32api
 
+# numba sizes its prange pool from this at import time; cap it like OpenCV's
+# pool in run_overlay so the fused kernel doesn't take every core
+os.environ.setdefault("NUMBA_NUM_THREADS", str(min(2, os.cpu_count() or 1)))
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:  # numba is optional; the OpenCV path is used instead
+    _HAS_NUMBA = False
+
 
 # --- Double-tap state ---
 DOUBLE_TAP_INTERVAL = 0.4
+_DOUBLE_TAP_KEYS = frozenset(('q', 'z', 'w'))
+_SINGLE_TAP_KEYS = frozenset(('r',))
 _last_press_time = {}
-_pending_actions = []
+# Filled by the keyboard hook thread, drained by the main loop; deque
+# append/popleft are atomic and O(1)
+_pending_actions = collections.deque()
+
+# --- Resize state ('[' / ']') ---
+RESIZE_STEP = 10  # px per tap
+RESIZE_RATE = 400  # px/s while a bracket key is held
+RESIZE_HOLD_DELAY = 0.25  # s before a held key starts resizing continuously
+_RESIZE_KEYS = {']': 1, '[': -1}
+_resize_lock = threading.Lock()
+_resize_delta = 0.0  # pending focus size change in px, drained by the main loop
+_resize_held = {}  # bracket key -> token of the press currently holding it
+
+
+def _resize_while_held(key, sign, token):
+    """Accumulate a dt-based size change while the press `token` is still held.
 
-def _on_key_press(event):
-    """Detect double-tap and queue actions."""
-    if event.event_type != keyboard.KEY_DOWN:
+    Key-up (or a newer press of the same key) replaces the token, which ends
+    the loop without touching the state of the newer press.
+    """
+    global _resize_delta
+    time.sleep(RESIZE_HOLD_DELAY)
+    last = time.perf_counter()
+    while _resize_held.get(key) is token:
+        time.sleep(0.016)
+        now = time.perf_counter()
+        with _resize_lock:
+            _resize_delta += sign * RESIZE_RATE * (now - last)
+        last = now
+
+
+def _on_resize_key_release(key):
+    """Key-up ends the hold right away, so the next tap counts immediately."""
+    _resize_held.pop(key, None)
+
+
+def _take_resize_delta():
+    """Return the whole-pixel part of the pending resize, keeping the remainder."""
+    global _resize_delta
+    with _resize_lock:
+        step = int(_resize_delta)
+        _resize_delta -= step
+    return step
+
+
+def _on_key_press(
+    event,
+    _double=_DOUBLE_TAP_KEYS,
+    _single=_SINGLE_TAP_KEYS,
+    _resize=_RESIZE_KEYS,
+    _held=_resize_held,
+    _now=time.time,
+    _last=_last_press_time,
+    _actions=_pending_actions,
+    _key_down=keyboard.KEY_DOWN,
+):
+    """Detect double-tap and queue actions.
+
+    Runs for every keystroke system-wide, so globals are bound as defaults
+    and unrelated keys return before any other work.
+    """
+    global _resize_delta
+    if event.event_type != _key_down:
         return
     key = event.name
-    now = time.time()
-    
-    if key in ('q', 'z', 'w'):
-        last = _last_press_time.get(key, 0)
-        if now - last < DOUBLE_TAP_INTERVAL:
-            _pending_actions.append(key)
-            _last_press_time[key] = 0  # reset
+
+    if key in _single:
+        _actions.append(key)
+        return
+
+    # Bracket keys: one step per tap, then a background thread takes over
+    # while the key is held (OS auto-repeat events are ignored meanwhile)
+    if key in _resize:
+        if key not in _held:
+            token = _held[key] = object()
+            with _resize_lock:
+                _resize_delta += _resize[key] * RESIZE_STEP
+            threading.Thread(target=_resize_while_held, args=(key, _resize[key], token), daemon=True).start()
+        return
+
+    if key in _double:
+        now = _now()
+        if now - _last.get(key, 0) < DOUBLE_TAP_INTERVAL:
+            _actions.append(key)
+            _last[key] = 0  # reset
         else:
-            _last_press_time[key] = now
+            _last[key] = now
 
 # Register globally
 keyboard.on_press(_on_key_press)
+for _key in _RESIZE_KEYS:
+    keyboard.on_release_key(_key, lambda event, key=_key: _on_resize_key_release(key))
+
+_HAS_STACK_BLUR = hasattr(cv2, "stackBlur")
+
+
+def _cuda_available():
+    """True when this OpenCV build has CUDA and a usable device."""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+
+# The fused numba kernel reads the frame once on the CPU; the CUDA path still
+# dims on the CPU and round-trips full frames over PCIe, so it is only the
+# fallback for machines without numba
+_USE_CUDA = not _HAS_NUMBA and _cuda_available()
+
+
+if _HAS_NUMBA:
+    def _dim_downsample_8x(src, dst_small, alpha):
+        """Fused dim + 8x8 box downsample: one read of `src`, one small write.
+
+        `src` may be the BGRA capture view; only the first `dst_small.shape[2]`
+        channels are read, so a 3-channel `dst_small` drops alpha for free.
+        """
+        sh, sw, nc = dst_small.shape
+        scale = alpha / 64.0
+        for y in prange(sh):
+            for x in range(sw):
+                for c in range(nc):
+                    acc = 0
+                    for dy in range(8):
+                        for dx in range(8):
+                            acc += src[y * 8 + dy, x * 8 + dx, c]
+                    dst_small[y, x, c] = min(acc * scale + 0.5, 255.0)
+
+    # nogil: the kernel runs on the capture thread and must not stall the main
+    # loop. cache=True needs a writable cache next to the source, which frozen
+    # (PyInstaller) builds don't have, so fall back to compiling in memory.
+    try:
+        _dim_downsample_8x = njit(parallel=True, fastmath=True, nogil=True, cache=True)(_dim_downsample_8x)
+    except RuntimeError:
+        _dim_downsample_8x = njit(parallel=True, fastmath=True, nogil=True)(_dim_downsample_8x)
+
 
 WINDOW_NAME = "Mouse Blur Overlay - Double press 'q' to quit"
 
@@ -57,105 +190,218 @@ def set_window_topmost(hwnd=None):
         )
 
 
-def make_window_click_through(hwnd=None):
-    """
-    Make the overlay ignore mouse clicks so you can still interact with
-    the underlying windows. Keyboard input (e.g. pressing 'q') will still
-    work when this window has focus.
-    """
-    if hwnd is None:
-        hwnd = get_overlay_hwnd()
-    if not hwnd:
-        return
-
-    GWL_EXSTYLE = -20
-    ex_style = win32gui.GetWindowLong(hwnd, GWL_EXSTYLE)
-    ex_style |= win32con.WS_EX_LAYERED | win32con.WS_EX_TRANSPARENT
-    win32gui.SetWindowLong(hwnd, GWL_EXSTYLE, ex_style)
-    # Ensure the window is fully opaque but still a layered window.
-    win32gui.SetLayeredWindowAttributes(hwnd, 0, 255, win32con.LWA_ALPHA)
-
-
-def run_overlay():
-    """
-    Phase 2: OS-wide blur preview using mouse as focus.
+_kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+_kernel32.GetCurrentThread.restype = wintypes.HANDLE
+_kernel32.SetThreadAffinityMask.argtypes = (wintypes.HANDLE, ctypes.c_size_t)
+_kernel32.SetThreadAffinityMask.restype = ctypes.c_size_t
 
-    - Captures the primary monitor.
-    - Blurs the whole image.
-    - Keeps a clear circular region around the mouse cursor.
-    - Shows result in a full-screen, always-on-top window.
 
-    NOTE: This first version is NOT click-through yet; it demonstrates
-    the visual effect and timing. You can press 'q' to close it.
-    """
+def pin_current_thread_off_core0():
+    """Keep the calling thread off core 0, leaving it to the UI thread."""
+    n_cpus = min(os.cpu_count() or 1, 64)  # affinity masks cover one 64-core group
+    if n_cpus < 2:
+        return
+    mask = ((1 << n_cpus) - 1) & ~1
+    if not _kernel32.SetThreadAffinityMask(_kernel32.GetCurrentThread(), mask):
+        print(f"Warning: Could not set background thread affinity: {ctypes.get_last_error()}")
 
-    screen_w = win32api.GetSystemMetrics(0)
-    screen_h = win32api.GetSystemMetrics(1)
 
-    # Capture screen BEFORE creating overlay window to avoid any flashing
-    with mss.mss() as sct:
-        monitor = sct.monitors[1]  # primary monitor
-        img = np.array(sct.grab(monitor))
-        frame_base = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+def wait_for_overlay_hwnd(timeout=0.2):
+    """Poll for the overlay HWND instead of sleeping a fixed interval."""
+    deadline = time.perf_counter() + timeout
+    hwnd = get_overlay_hwnd()
+    while not hwnd and time.perf_counter() < deadline:
+        time.sleep(0.001)
+        hwnd = get_overlay_hwnd()
+    return hwnd
 
-    # Create the overlay window
-    cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
-    cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
 
-    # Give the window a moment to appear, then make it topmost
-    time.sleep(0.2)
-    hwnd = get_overlay_hwnd()
+def setup_overlay_window(hwnd, key_color_int):
+    """Apply topmost, capture exclusion and chroma-key styles in one batch."""
     set_window_topmost(hwnd)
 
-    # Exclude overlay from screen capture so update_background() captures actual desktop
+    # Exclude overlay from screen capture so the background thread captures the actual desktop
     try:
-        import ctypes
         WDA_EXCLUDEFROMCAPTURE = 0x00000011
         ctypes.windll.user32.SetWindowDisplayAffinity(hwnd, WDA_EXCLUDEFROMCAPTURE)
     except Exception as e:
         print(f"Warning: Could not set window display affinity: {e}")
 
-    # Setup Chroma Key (Green)
-    # Windows renders this color as fully transparent (visual + input)
-    # provided we use LWA_COLORKEY.
-    key_color_bgr = (0, 255, 0)
-    key_color_int = win32api.RGB(0, 255, 0)  # win32 expects RGB, not BGR
-
     # Apply extended window styles for transparency
     GWL_EXSTYLE = -20
     ex_style = win32gui.GetWindowLong(hwnd, GWL_EXSTYLE)
-    
+
     # We REMOVE WS_EX_TRANSPARENT so the opaque parts (blur) BLOCK clicks.
     # The transparent parts (hole) will let clicks through automatically via LWA_COLORKEY.
     ex_style |= win32con.WS_EX_LAYERED
     # Hide from taskbar so it doesn't create an extra icon while running
     ex_style |= win32con.WS_EX_TOOLWINDOW
-    
+
     win32gui.SetWindowLong(hwnd, GWL_EXSTYLE, ex_style)
-    # Set the Chroma Key. 
+    # Set the Chroma Key.
     # Note: COLORREF is 0x00bbggrr, win32api.RGB returns this format.
     win32gui.SetLayeredWindowAttributes(hwnd, key_color_int, 0, win32con.LWA_COLORKEY)
 
+
+def clip_rect(x1, y1, x2, y2, w, h):
+    """Clamp an end-exclusive (x1, y1, x2, y2) rect to a w x h frame.
+
+    Every coordinate ends up in [0, w] / [0, h], so a rect fully outside the
+    frame becomes empty rather than producing negative (wrapping) slices.
+    """
+    return (
+        min(max(x1, 0), w),
+        min(max(y1, 0), h),
+        min(max(x2, 0), w),
+        min(max(y2, 0), h),
+    )
+
+
+def restore_outside(dst, src, rect, keep):
+    """Copy `rect` from `src` into `dst`, skipping the part that overlaps `keep`.
+
+    Rects are (x1, y1, x2, y2) end-exclusive and already clipped to the frame.
+    """
+    x1, y1, x2, y2 = rect
+    kx1, ky1 = max(x1, keep[0]), max(y1, keep[1])
+    kx2, ky2 = min(x2, keep[2]), min(y2, keep[3])
+    if kx1 >= kx2 or ky1 >= ky2:
+        dst[y1:y2, x1:x2] = src[y1:y2, x1:x2]
+        return
+    # Up to four strips around the overlap
+    dst[y1:ky1, x1:x2] = src[y1:ky1, x1:x2]
+    dst[ky2:y2, x1:x2] = src[ky2:y2, x1:x2]
+    dst[ky1:ky2, x1:kx1] = src[ky1:ky2, x1:kx1]
+    dst[ky1:ky2, kx2:x2] = src[ky1:ky2, kx2:x2]
+
+
+def grab_bgra(sct, monitor):
+    """Grab a monitor as a BGRA ndarray view over the screenshot's raw bytes.
+
+    No copy or colour conversion here: alpha is dropped by the downscale step,
+    so the blurred background and the composed frame are BGR (what imshow
+    presents anyway) and per-frame work moves 3 bytes per pixel, not 4.
+    """
+    shot = sct.grab(monitor)
+    return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+
+def run_overlay():
+    """
+    Phase 2: OS-wide blur preview using mouse as focus.
+
+    - Captures the primary monitor.
+    - Blurs the whole image.
+    - Keeps a clear circular region around the mouse cursor.
+    - Shows result in a full-screen, always-on-top window.
+
+    NOTE: Only the focus hole is click-through (via the LWA_COLORKEY key
+    colour); the blurred area blocks clicks. Double press 'q' to close it.
+    """
+
+    # OpenCV runs on the main and background threads; a small pool avoids
+    # oversubscribing the cores for the few resize/dim calls we make
+    # (numba's pool is capped the same way at import)
+    cv2.setUseOptimized(True)
+    cv2.setNumThreads(min(2, os.cpu_count() or 1))
+
+    screen_w = win32api.GetSystemMetrics(0)
+    screen_h = win32api.GetSystemMetrics(1)
+
+    # Capture screen BEFORE creating overlay window to avoid any flashing
+    with mss.mss() as sct:
+        monitor = sct.monitors[1]  # primary monitor
+        frame_base = grab_bgra(sct, monitor)
+
     focus_w = 800
     focus_h = 600
     # Blur settings
     dim_alpha = 0.35  # lower = darker/more comfortable
     downscale_factor = 8  # downscale by 8x then upscale = fast, strong blur
-
-    def fast_blur(img):
-        """Ultra-fast blur using downscale→upscale trick."""
-        h, w = img.shape[:2]
-        small = cv2.resize(img, (w // downscale_factor, h // downscale_factor), interpolation=cv2.INTER_LINEAR)
-        return cv2.resize(small, (w, h), interpolation=cv2.INTER_LINEAR)
-
-    def compute_blurred(frame):
-        """Dim + fast blur."""
-        dim = cv2.addWeighted(frame, dim_alpha, np.zeros_like(frame), 1 - dim_alpha, 0)
-        return fast_blur(dim)
+    use_fused = _HAS_NUMBA and downscale_factor == 8  # cleared if the kernel fails to start
+
+    # Scratch buffers reused across blurs (OpenCV writes into them via dst=)
+    small_buf = None  # BGR, 1/downscale_factor per side
+    small_bgra_buf = None  # OpenCV fallback: small image before alpha is dropped
+    dim_buf = None
+    if _USE_CUDA:
+        # Persistent device buffers for the full-frame resize passes
+        gpu_full = cv2.cuda_GpuMat()
+        gpu_small = cv2.cuda_GpuMat()
+        gpu_up = cv2.cuda_GpuMat()
+
+    def blur_small_and_upscale(w, h, dst=None):
+        """Blur `small_buf` in place and upscale it to (w, h)."""
+        # A small blur at 1/64 of the pixels smooths out the blocky upscale.
+        # stackBlur (OpenCV >= 4.7) costs O(1) per pixel regardless of kernel size.
+        if _HAS_STACK_BLUR:
+            cv2.stackBlur(small_buf, (11, 11), dst=small_buf)
+        else:
+            cv2.GaussianBlur(small_buf, (11, 11), 0, dst=small_buf)
+        if _USE_CUDA:
+            gpu_small.upload(small_buf)
+            cv2.cuda.resize(gpu_small, (w, h), dst=gpu_up, interpolation=cv2.INTER_LINEAR)
+            return gpu_up.download(dst)
+        return cv2.resize(small_buf, (w, h), dst=dst, interpolation=cv2.INTER_LINEAR)
+
+    def dim_and_downscale(frame):
+        """Dim BGRA `frame` and shrink it by `downscale_factor` into BGR `small_buf`."""
+        nonlocal dim_buf, small_buf, small_bgra_buf
+        h, w = frame.shape[:2]
+        if use_fused:
+            # Fused kernel skips the full-size dimmed intermediate entirely
+            small_shape = (h // 8, w // 8, 3)
+            if small_buf is None or small_buf.shape != small_shape:
+                small_buf = np.empty(small_shape, dtype=np.uint8)
+            _dim_downsample_8x(frame, small_buf, dim_alpha)
+            return
+        dim_buf = cv2.convertScaleAbs(frame, dst=dim_buf, alpha=dim_alpha)
+        small_size = (w // downscale_factor, h // downscale_factor)
+        if _USE_CUDA:
+            # Both full-frame resizes run on the GPU; only the tiny image is blurred on CPU
+            gpu_full.upload(dim_buf)
+            cv2.cuda.resize(gpu_full, small_size, dst=gpu_small, interpolation=cv2.INTER_AREA)
+            small_bgra_buf = gpu_small.download(small_bgra_buf)
+        else:
+            small_bgra_buf = cv2.resize(dim_buf, small_size, dst=small_bgra_buf, interpolation=cv2.INTER_AREA)
+        # Drop alpha at 1/64 of the pixels instead of on the full frame
+        small_buf = cv2.cvtColor(small_bgra_buf, cv2.COLOR_BGRA2BGR, dst=small_buf)
+
+    def compute_blurred(frame, dst=None):
+        """Dim + fast blur (downscale→small blur→upscale), written into `dst` when it fits."""
+        dim_and_downscale(frame)
+        h, w = frame.shape[:2]
+        return blur_small_and_upscale(w, h, dst)
+
+    # Warm up the kernel before the window exists, so the one-off numba compile
+    # doesn't happen behind a blank topmost window. The first call also starts
+    # numba's thread pool, the usual failure point in frozen builds.
+    if use_fused:
+        try:
+            dim_and_downscale(frame_base)
+        except Exception as e:
+            print(f"Warning: numba kernel unavailable, using OpenCV instead: {e}")
+            use_fused = False
 
     # Pre-compute blurred version
     blurred_base = compute_blurred(frame_base)
 
+    # Create the overlay window
+    cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
+    cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+
+    # Setup Chroma Key (Green)
+    # Windows renders this color as fully transparent (visual + input)
+    # provided we use LWA_COLORKEY.
+    # Kept as a uint8 pixel so the per-frame fill broadcasts it without
+    # converting a Python tuple each time
+    key_color_bgr = np.array((0, 255, 0), dtype=np.uint8)
+    key_color_int = win32api.RGB(0, 255, 0)  # win32 expects RGB, not BGR
+
+    # Wait only as long as the window actually takes to appear, then style it
+    hwnd = wait_for_overlay_hwnd()
+    setup_overlay_window(hwnd, key_color_int)
+
     # Mouse position state
     last_mx, last_my = win32api.GetCursorPos()
     
@@ -166,31 +412,70 @@ def run_overlay():
     # --- Background thread for screen capture ---
     _bg_lock = threading.Lock()
     _bg_blurred = blurred_base
+    _bg_gen = 0  # bumped on every publish; buffers are reused, so identity isn't enough
     _bg_frame = frame_base
     _bg_running = True
+    _bg_refresh = threading.Event()  # set to wake the capture thread immediately
+    _bg_updated = threading.Event()  # set by the capture thread when _bg_blurred changes
 
     def _bg_capture_loop():
-        nonlocal _bg_blurred, _bg_frame, _bg_running
+        nonlocal _bg_blurred, _bg_gen, _bg_frame, _bg_running
+        # Pins this thread only: OpenCV's and numba's worker threads are
+        # limited in number but may still run on core 0
+        pin_current_thread_off_core0()
+        # Double buffering: render into the back buffer, then swap it with the
+        # published one, so no frame-sized array is allocated per refresh.
+        back = np.empty_like(blurred_base)
+        last_key = None  # (dark_mode, content signature) of the published background
+        forced = False
         with mss.mss() as bg_sct:
             bg_monitor = bg_sct.monitors[1]
             while _bg_running:
                 try:
-                    img = np.array(bg_sct.grab(bg_monitor))
-                    new_frame = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+                    new_frame = grab_bgra(bg_sct, bg_monitor)
+                    # Signature of the 1/8 image the blur needs anyway: every source
+                    # pixel contributes to it. Skip the blur, upscale and swap when
+                    # it is unchanged. 'r' forces a rebuild.
                     if dark_mode:
-                        new_blurred = np.zeros_like(new_frame)
+                        key = (True, None)
                     else:
-                        new_blurred = compute_blurred(new_frame)
-                    with _bg_lock:
-                        _bg_frame = new_frame
-                        _bg_blurred = new_blurred
+                        dim_and_downscale(new_frame)
+                        key = (False, new_frame.shape, zlib.crc32(small_buf))
+                    if key != last_key or forced:
+                        last_key = key
+                        bg_shape = new_frame.shape[:2] + (3,)
+                        if back.shape != bg_shape:
+                            back = np.empty(bg_shape, dtype=np.uint8)
+                        if dark_mode:
+                            back.fill(0)
+                            new_blurred = back
+                        else:
+                            h, w = new_frame.shape[:2]
+                            new_blurred = blur_small_and_upscale(w, h, dst=back)
+                        with _bg_lock:
+                            _bg_frame = new_frame
+                            back = _bg_blurred
+                            _bg_blurred = new_blurred
+                            _bg_gen += 1
+                        _bg_updated.set()
                 except Exception:
                     pass
-                time.sleep(0.3)  # ~3 FPS background refresh
+                # ~3 FPS background refresh, or sooner when a refresh is requested
+                forced = _bg_refresh.wait(0.3)
+                _bg_refresh.clear()
 
     bg_thread = threading.Thread(target=_bg_capture_loop, daemon=True)
     bg_thread.start()
 
+    # Persistent output buffer: only the previous focus rectangle is restored
+    # from the blurred background each frame instead of copying the whole screen.
+    composed = np.empty_like(blurred_base)
+    np.copyto(composed, blurred_base)
+    composed_gen = 0  # _bg_gen of the background `composed` was built from
+    prev_rect = None  # (x1, y1, x2, y2) dirty region of the last drawn hole
+    border_pad = 2  # extra pixels touched by the anti-aliased border
+    last_state = None  # inputs of the last drawn frame, to skip redundant redraws
+
     print("Controls:")
     print("  'q' + 'q': Quit")
     print("  'r': Refresh (Manual)")
@@ -199,11 +484,21 @@ def run_overlay():
     print("  '[' / ']': Resize focus area")
 
 
+    frame_interval = 1 / 60  # cap both drawn and idle frames at ~60 FPS
+
     while True:
+        frame_start = time.perf_counter()
 
         # Get latest blurred frame from background thread
         with _bg_lock:
             blurred = _bg_blurred
+            blurred_gen = _bg_gen
+
+        # Adjust size with '[' and ']' (accumulated by the keyboard hook threads)
+        resize_step = _take_resize_delta()
+        if resize_step and not smart_focus_mode:
+            focus_w = max(50, focus_w + resize_step)
+            focus_h = max(50, focus_h + resize_step)
         
         if smart_focus_mode:
             try:
@@ -229,13 +524,46 @@ def run_overlay():
         y1 = my - focus_h // 2
         x2 = mx + focus_w // 2
         y2 = my + focus_h // 2
-        
-        composed = blurred.copy()
+
+        # Nothing changed since the last frame: skip drawing and imshow entirely
+        state = (mx, my, focus_w, focus_h, dark_mode, smart_focus_mode)
+        if state == last_state and blurred_gen == composed_gen and not _pending_actions:
+            # Idle: pump window messages, then sleep until a new background
+            # arrives or one display frame passes (mouse/keys are re-checked then)
+            cv2.waitKey(1)
+            _bg_updated.wait(frame_interval)
+            _bg_updated.clear()
+            continue
+        last_state = state
+
+        # Hole rect clipped to the frame on both ends (+1 because cv2.rectangle's
+        # filled rect includes x2/y2). Both ends are clamped to [0, size] so a
+        # hole on another monitor yields an empty rect instead of negative
+        # indices that would wrap around.
+        frame_h, frame_w = blurred.shape[:2]
+        hole_rect = clip_rect(x1, y1, x2 + 1, y2 + 1, frame_w, frame_h)
+
+        if blurred_gen != composed_gen:
+            # Background changed: repaint the whole frame once
+            if composed.shape != blurred.shape:
+                composed = np.empty_like(blurred)
+            np.copyto(composed, blurred)
+            composed_gen = blurred_gen
+        elif prev_rect is not None:
+            # Restore the previous hole + border, except where the new hole
+            # is about to be filled anyway
+            restore_outside(composed, blurred, prev_rect, hole_rect)
+
+        prev_rect = clip_rect(
+            x1 - border_pad, y1 - border_pad, x2 + border_pad + 1, y2 + border_pad + 1, frame_w, frame_h
+        )
 
         # Draw the transparency hole (Rectangle)
         # Instead of copying the clear frame, we draw the KEY COLOR.
         # Windows will render this as transparent.
-        cv2.rectangle(composed, (x1, y1), (x2, y2), key_color_bgr, -1)
+        # Axis-aligned solid fill, so a clipped slice store beats cv2.rectangle.
+        hx1, hy1, hx2, hy2 = hole_rect
+        composed[hy1:hy2, hx1:hx2] = key_color_bgr
 
         # Optional: white border visual
         cv2.rectangle(
@@ -252,7 +580,7 @@ def run_overlay():
         # Process double-tap actions
         running = True
         while _pending_actions:
-            action = _pending_actions.pop(0)
+            action = _pending_actions.popleft()
             if action == 'q':
                 running = False
             elif action == 'w':
@@ -264,24 +592,21 @@ def run_overlay():
             elif action == 'z':
                 dark_mode = not dark_mode
                 print(f"Dark Mode: {'ON' if dark_mode else 'OFF'}")
+                _bg_refresh.set()
+            elif action == 'r':
+                _bg_refresh.set()
 
         if not running:
             break
 
-        # Adjust size with '[' and ']'
-        if not smart_focus_mode:
-            if keyboard.is_pressed(']'):
-                focus_w += 10
-                focus_h += 10
-                time.sleep(0.01)
-            if keyboard.is_pressed('['):
-                focus_w = max(50, focus_w - 10)
-                focus_h = max(50, focus_h - 10)
-                time.sleep(0.01)
-        
         cv2.waitKey(1)
+        # Drawn frames are paced too, so a moving mouse doesn't spin a core
+        remaining = frame_interval - (time.perf_counter() - frame_start)
+        if remaining > 0:
+            time.sleep(remaining)
 
     _bg_running = False
+    _bg_refresh.set()
     keyboard.unhook_all()
     cv2.destroyAllWindows()
 